@@ -0,0 +1,31 @@
+"""Image dimensions cache
+
+Revision ID: 4c32e11b6753
+Revises: 21bfb4710834
+Create Date: 2026-10-18 21:52:07.418523
+
+"""
+# pylint: skip-file
+from sqlalchemy import Column, Integer, String
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4c32e11b6753"
+down_revision = "21bfb4710834"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "image_dimensions",
+        Column("url", String, primary_key=True),
+        Column("width", Integer),
+        Column("height", Integer),
+        Column("date", String, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("image_dimensions")
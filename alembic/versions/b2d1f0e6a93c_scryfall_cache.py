@@ -0,0 +1,30 @@
+"""Scryfall cache
+
+Revision ID: b2d1f0e6a93c
+Revises: 4c32e11b6753
+Create Date: 2026-10-18 22:31:45.103257
+
+"""
+# pylint: skip-file
+from sqlalchemy import Column, String
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b2d1f0e6a93c"
+down_revision = "4c32e11b6753"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scryfall_cache",
+        Column("url", String, primary_key=True),
+        Column("body", String),
+        Column("expiry", String, nullable=False, index=True),
+    )
+
+
+def downgrade():
+    op.drop_table("scryfall_cache")
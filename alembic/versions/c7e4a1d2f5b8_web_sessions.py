@@ -0,0 +1,30 @@
+"""Web sessions
+
+Revision ID: c7e4a1d2f5b8
+Revises: b2d1f0e6a93c
+Create Date: 2026-10-19 00:42:17.318904
+
+"""
+# pylint: skip-file
+from sqlalchemy import Column, String
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7e4a1d2f5b8"
+down_revision = "b2d1f0e6a93c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "web_sessions",
+        Column("session_id", String, primary_key=True),
+        Column("data", String, nullable=False),
+        Column("expiry", String, nullable=False, index=True),
+    )
+
+
+def downgrade():
+    op.drop_table("web_sessions")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import re
+from functools import partial
 from time import time
 from typing import TYPE_CHECKING
 from weakref import WeakValueDictionary
@@ -10,10 +11,12 @@ import websockets
 
 import utils
 from handlers import handlers
+from http_client import HTTPClient
 from models.room import Room
 from models.user import User
 from plugins import commands
-from tasks import init_tasks
+from scheduler import Scheduler
+from tasks import init_tasks, recurring_tasks
 from typedefs import RoomId, UserId
 
 if TYPE_CHECKING:
@@ -52,7 +55,10 @@ class Connection:
         self.unittesting = unittesting
         self.public_roomids: set[str] = set()
         self.users: WeakValueDictionary[UserId, User] = WeakValueDictionary()
+        # Rooms of every user, maintained by Room.add_user and Room.remove_user
+        self.user_rooms: dict[UserId, set[Room]] = {}
         self.init_tasks = init_tasks
+        self.recurring_tasks = recurring_tasks
         self.handlers = handlers
         self.commands = commands
         self.timestamp: float = 0
@@ -61,6 +67,8 @@ class Connection:
         self.websocket: websockets.client.WebSocketClientProtocol | None = None
         self.connection_start: float | None = None
         self.tiers: list[TiersDict] = []
+        self.http = HTTPClient()
+        self.scheduler = Scheduler()
 
     def open_connection(self) -> None:
         try:
@@ -82,6 +90,9 @@ class Connection:
             for itask in itasks:
                 await itask
 
+        for minute, hour, func in self.recurring_tasks:
+            self.scheduler.cron(partial(func, self), minute=minute, hour=hour)
+
         try:
             async with websockets.connect(
                 self.url,
@@ -101,6 +112,9 @@ class Connection:
             OSError,  # https://github.com/aaugustin/websockets/issues/593
         ):
             pass
+        finally:
+            self.scheduler.stop()
+            await self.http.close()
 
     async def _parse_message(self, message: str) -> None:
         """Extracts a Room object from a raw message.
@@ -119,10 +133,6 @@ class Connection:
         roomid = utils.to_room_id(roomname)
         room = Room.get(self, roomid)
 
-        # Try to set modchat if it's a public room and cerbottana has relevant auth
-        if room.roombot and not room.is_private:
-            await room.try_modchat()
-
         for msg in message.split("\n"):
 
             if language := re.match(r"This room's primary language is (.*)", msg):
@@ -30,6 +30,15 @@ class EightBall(Base):
     roomid = Column(String, nullable=False)
 
 
+class ImageDimensions(Base):
+    __tablename__ = "image_dimensions"
+
+    url = Column(String, primary_key=True)
+    width = Column(Integer)  # NULL if the image couldn't be probed
+    height = Column(Integer)
+    date = Column(String, nullable=False)
+
+
 class Quotes(Base):
     __tablename__ = "quotes"
     __table_opts__ = (
@@ -57,6 +66,14 @@ class Repeats(Base):
     expire_dt = Column(String)
 
 
+class ScryfallCache(Base):
+    __tablename__ = "scryfall_cache"
+
+    url = Column(String, primary_key=True)  # see plugins.tcg.normalize_scryfall_url
+    body = Column(String)  # NULL if the query is invalid
+    expiry = Column(String, nullable=False, index=True)
+
+
 class Tokens(Base):
     __tablename__ = "tokens"
 
@@ -77,3 +94,11 @@ class Users(Base):
     avatar = Column(String)
     description = Column(String)
     description_pending = Column(String, index=True)
+
+
+class WebSessions(Base):
+    __tablename__ = "web_sessions"
+
+    session_id = Column(String, primary_key=True)
+    data = Column(String, nullable=False)  # JSON object
+    expiry = Column(String, nullable=False, index=True)
@@ -0,0 +1,35 @@
+# pylint: disable=too-few-public-methods
+
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+# Bit order of Cards.legalities
+LEGALITY_FORMATS = (
+    "standard",
+    "future",
+    "historic",
+    "pioneer",
+    "modern",
+    "legacy",
+    "pauper",
+    "vintage",
+    "penny",
+    "commander",
+    "brawl",
+    "duel",
+    "oldschool",
+)
+
+
+class Cards(Base):
+    __tablename__ = "cards"
+
+    card_id = Column(String, primary_key=True)  # see plugins.tcg.to_card_id
+    name = Column(String, nullable=False)
+    legalities = Column(Integer, nullable=False)  # bitmask, see LEGALITY_FORMATS
+    is_basic = Column(Integer, nullable=False)
+    is_extra = Column(Integer, nullable=False)  # tokens, planes, ...
+    data = Column(String, nullable=False)  # JSON subset of the Scryfall Card object
@@ -4,8 +4,6 @@ import asyncio
 import json
 from typing import TYPE_CHECKING
 
-import aiohttp
-
 import utils
 from handlers import handler_wrapper
 from models.room import Room
@@ -27,9 +25,8 @@ async def challstr(conn: Connection, room: Room, *args: str) -> None:
         "challstr": "|".join(args),
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, data=payload) as resp:
-            assertion = json.loads((await resp.text("utf-8"))[1:])["assertion"]
+    resp = await conn.http.post(url, data=payload)
+    assertion = json.loads(resp.text()[1:])["assertion"]
 
     if assertion:
         await conn.send(f"|/trn {conn.username},0,{assertion}")
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from time import monotonic, perf_counter
+from typing import Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDictProxy
+
+from typedefs import JsonDict
+
+# Status codes worth retrying: rate limits and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+RequestKey = Tuple[str, Tuple[Tuple[str, str], ...]]  # url, headers
+
+
+class HTTPResponse:
+    """Fully read HTTP response, so that it can be shared between coalesced requests.
+
+    Attributes:
+        url (str): Requested url.
+        status (int): HTTP status code.
+        headers (CIMultiDictProxy[str]): Response headers.
+        body (bytes): Response body.
+        content_type (str): Mime type of the body, without parameters.
+    """
+
+    def __init__(
+        self, url: str, status: int, headers: CIMultiDictProxy[str], body: bytes
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def content_type(self) -> str:
+        content_type = self.headers.get("Content-Type", "application/octet-stream")
+        return content_type.split(";")[0].strip().lower()
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self) -> JsonDict:
+        data: JsonDict = json.loads(self.body)
+        return data
+
+
+class HostStats:
+    """Latency metrics of the requests sent to a single host.
+
+    Attributes:
+        requests (int): Number of completed requests, including failed ones.
+        errors (int): Number of requests that raised an exception.
+        total_time (float): Sum of the latencies, in seconds.
+        max_time (float): Highest latency, in seconds.
+        mean_time (float): Average latency, in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.requests if self.requests else 0.0
+
+    def add(self, elapsed: float, error: bool = False) -> None:
+        self.requests += 1
+        self.errors += error
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} requests ({self.errors} errors), "
+            f"mean {self.mean_time * 1000:.0f} ms, max {self.max_time * 1000:.0f} ms"
+        )
+
+
+class HTTPClient:
+    """Connection-pooled HTTP client shared by the whole bot, see Connection.http.
+
+    Identical GET requests that are in flight at the same time are coalesced into a
+    single request, and idempotent requests are retried with an exponential backoff.
+
+    Attributes:
+        limit_per_host (int): Maximum number of concurrent connections to a host.
+        timeout (aiohttp.ClientTimeout): Default timeouts for every request.
+        retries (int): How many times a failed GET or HEAD request is retried.
+        backoff (float): Base delay between retries, in seconds.
+        stats (dict[str, HostStats]): Latency metrics, keyed by host.
+        rate_limits (dict[str, float]): Minimum delay between two requests to the same
+            host, in seconds, see set_rate_limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit_per_host: int = 4,
+        timeout: float = 15,
+        connect_timeout: float = 5,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ) -> None:
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.stats: dict[str, HostStats] = {}
+        self.rate_limits: dict[str, float] = {}
+
+        self._session: aiohttp.ClientSession | None = None
+        self._inflight: dict[RequestKey, asyncio.Task[HTTPResponse]] = {}
+        self._rate_limit_locks: dict[str, asyncio.Lock] = {}
+        self._last_request: dict[str, float] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Underlying aiohttp session, lazily created within the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+        return self._session
+
+    def set_rate_limit(self, host: str, interval: float) -> None:
+        """Delays requests to a host so that they are sent at most every `interval`
+        seconds. Pending requests are queued in FIFO order.
+
+        Args:
+            host (str): Hostname, i.e. "api.scryfall.com".
+            interval (float): Minimum delay between two requests, in seconds.
+        """
+        self.rate_limits[host] = interval
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(
+        self, url: str, *, headers: Mapping[str, str] | None = None
+    ) -> HTTPResponse:
+        """Sends a GET request, sharing the response with identical pending requests.
+
+        Args:
+            url (str): Request url.
+            headers (Mapping[str, str] | None): Additional request headers. Defaults to
+                None.
+
+        Returns:
+            HTTPResponse: Response.
+        """
+        key: RequestKey = (url, tuple(sorted(headers.items())) if headers else ())
+        if key not in self._inflight:
+            task = asyncio.create_task(self.request("GET", url, headers=headers))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._inflight[key] = task
+        # A cancelled caller shouldn't cancel the request for everyone else.
+        return await asyncio.shield(self._inflight[key])
+
+    async def post(
+        self,
+        url: str,
+        *,
+        data: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> HTTPResponse:
+        """Sends a POST request. POST requests are never coalesced nor retried.
+
+        Args:
+            url (str): Request url.
+            data (Mapping[str, str] | None): Form data. Defaults to None.
+            headers (Mapping[str, str] | None): Additional request headers. Defaults to
+                None.
+
+        Returns:
+            HTTPResponse: Response.
+        """
+        return await self.request("POST", url, data=data, headers=headers)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> HTTPResponse:
+        """Sends a request and reads the whole response body.
+
+        GET and HEAD requests are retried if they fail with a connection error, a
+        timeout or a transient status code (see RETRY_STATUSES).
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request url.
+            data (Mapping[str, str] | None): Form data. Defaults to None.
+            headers (Mapping[str, str] | None): Additional request headers. Defaults to
+                None.
+
+        Raises:
+            aiohttp.ClientConnectionError: Connection failed after every retry. Other
+                subclasses of aiohttp.ClientError are never retried.
+            asyncio.TimeoutError: Request timed out after every retry.
+
+        Returns:
+            HTTPResponse: Response.
+        """
+        retries = self.retries if method in ("GET", "HEAD") else 0
+        attempt = 0
+        while True:
+            response: HTTPResponse | None = None
+            try:
+                async with self.stream(method, url, data=data, headers=headers) as resp:
+                    response = HTTPResponse(
+                        url, resp.status, resp.headers, await resp.read()
+                    )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    return response
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    @asynccontextmanager
+    async def stream(  # type: ignore[misc]
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Sends a single request without reading the response body.
+
+        Use this if you only need part of the body; the connection is discarded if the
+        body isn't read completely.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request url.
+            data (Mapping[str, str] | None): Form data. Defaults to None.
+            headers (Mapping[str, str] | None): Additional request headers. Defaults to
+                None.
+
+        Raises:
+            aiohttp.ClientError: Request failed.
+            asyncio.TimeoutError: Request timed out.
+
+        Yields:
+            aiohttp.ClientResponse: Response.
+        """
+        host = urlsplit(url).hostname or ""
+        if host in self.rate_limits:
+            await self._wait_rate_limit(host)
+
+        stats = self.stats.setdefault(host, HostStats())
+        start = perf_counter()
+        try:
+            async with self.session.request(
+                method, url, data=data, headers=headers
+            ) as resp:
+                yield resp
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats.add(perf_counter() - start, error=True)
+            raise
+        stats.add(perf_counter() - start)
+
+    async def _wait_rate_limit(self, host: str) -> None:
+        if host not in self._rate_limit_locks:
+            self._rate_limit_locks[host] = asyncio.Lock()
+        async with self._rate_limit_locks[host]:
+            delay = (
+                self._last_request.get(host, 0) + self.rate_limits[host] - monotonic()
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request[host] = monotonic()
+
+    def _retry_delay(self, attempt: int, response: HTTPResponse | None) -> float:
+        delay: float = self.backoff * 2 ** attempt
+        if response is not None and response.status == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+        return delay
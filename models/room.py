@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import deque
-from datetime import datetime
+from datetime import datetime, timedelta
 from textwrap import shorten
 from time import time
 from typing import TYPE_CHECKING
@@ -13,10 +13,43 @@ from typedefs import RoomId
 
 if TYPE_CHECKING:
     from connection import Connection
+    from scheduler import Job
 
     from .user import User
 
 
+MODCHAT_TZ = pytz.timezone("Europe/Rome")
+# Modchat is set if there are no mods online for MODCHAT_DELAY seconds, but only
+# between MODCHAT_START and MODCHAT_END (minutes since midnight, MODCHAT_TZ).
+MODCHAT_START = 30  # 00:30
+MODCHAT_END = 8 * 60  # 08:00
+MODCHAT_DELAY = 7 * 60
+
+
+def next_modchat_check(no_mods_online: float, now: datetime) -> datetime:
+    """Computes when modchat should be set after the last mod left a room.
+
+    Args:
+        no_mods_online (float): Timestamp of when the last mod left.
+        now (datetime): Current time, in MODCHAT_TZ.
+
+    Returns:
+        datetime: First time in the modchat window, in MODCHAT_TZ, at least
+            MODCHAT_DELAY seconds after no_mods_online.
+    """
+    earliest = datetime.fromtimestamp(no_mods_online + MODCHAT_DELAY, MODCHAT_TZ)
+    check = max(now, earliest)
+    minutes = check.hour * 60 + check.minute
+    if MODCHAT_START <= minutes < MODCHAT_END:
+        return check
+
+    day = check.date()
+    if minutes >= MODCHAT_END:
+        day += timedelta(days=1)
+    midnight = MODCHAT_TZ.localize(datetime(day.year, day.month, day.day))
+    return MODCHAT_TZ.normalize(midnight + timedelta(minutes=MODCHAT_START))
+
+
 class Room:
     """Represents a PS room.
 
@@ -35,8 +68,8 @@ class Room:
         roombot (bool): True if cerbottana is roombot in this room.
         title (str): Formatted variant of roomid.
         users (dict[User, str]): User instance, rank string.
-        no_mods_online (float | None)
-        last_modchat_command (float)
+        no_mods_online (float | None): Timestamp of when the last non-idle mod left
+            the room, None if there are mods online.
 
     Todo:
         Rooms should be removed from conn.rooms if they |deinit|.
@@ -62,8 +95,9 @@ class Room:
 
         # Attributes updated within this instance
         self._users: dict[User, str] = {}  # user, rank
+        self._active_mods: set[User] = set()  # Non-idle users with room rank >= driver
         self.no_mods_online: float | None = None
-        self.last_modchat_command: float = 0
+        self._modchat_job: Job | None = None
 
         # Register new initialized room
         if self.roomid in self.conn.rooms:
@@ -100,12 +134,15 @@ class Room:
         if not rank:
             rank = self._users[user] if user in self._users else " "
         self._users[user] = rank
+        self.conn.user_rooms.setdefault(user.userid, set()).add(self)
 
-        if user.has_role("driver", self, ignore_grole=True):
-            if not user.idle:
-                self.no_mods_online = None
-            else:
-                self._check_no_mods_online()
+        if not user.idle and user.has_role("driver", self, ignore_grole=True):
+            self._active_mods.add(user)
+            self._set_no_mods_online(False)
+        elif user in self._active_mods:
+            self._active_mods.discard(user)
+            if not self._active_mods:
+                self._set_no_mods_online(True)
 
         # User persistance
         if user.userid not in self.conn.users:
@@ -121,7 +158,15 @@ class Room:
         """
         if user in self._users:
             self._users.pop(user)
-            self._check_no_mods_online()
+            if user in self._active_mods:
+                self._active_mods.discard(user)
+                if not self._active_mods:
+                    self._set_no_mods_online(True)
+
+            user_rooms = self.conn.user_rooms[user.userid]
+            user_rooms.discard(self)
+            if not user_rooms:
+                del self.conn.user_rooms[user.userid]
 
     def __str__(self) -> str:
         return self.roomid
@@ -129,31 +174,42 @@ class Room:
     def __contains__(self, user: User) -> bool:
         return user in self.users
 
-    def _check_no_mods_online(self) -> None:
-        if self.no_mods_online:
+    def _set_no_mods_online(self, no_mods_online: bool) -> None:
+        if self._modchat_job is not None:
+            self._modchat_job.cancel()
+            self._modchat_job = None
+
+        if not no_mods_online:
+            self.no_mods_online = None
             return
-        for user in self._users:
-            if user.idle:
-                continue
-            if user.has_role("driver", self, ignore_grole=True):
-                self.no_mods_online = None
-                return
-            self.no_mods_online = time()
+
+        self.no_mods_online = time()
+        self._schedule_modchat()
+
+    def _schedule_modchat(self, not_before: datetime | None = None) -> None:
+        if self.no_mods_online is None:
+            return
+        now = datetime.now(MODCHAT_TZ)
+        check = next_modchat_check(self.no_mods_online, max(now, not_before or now))
+        self._modchat_job = self.conn.scheduler.once(
+            self.try_modchat, (check - now).total_seconds()
+        )
 
     async def try_modchat(self) -> None:
-        """Sets modchat in a specific time frame if the are no mods online."""
-        if not self.modchat and self.no_mods_online:
-            tz = pytz.timezone("Europe/Rome")
-            timestamp = datetime.now(tz)
-            minutes = timestamp.hour * 60 + timestamp.minute
-            # 00:30 - 08:00
-            if (
-                30 <= minutes < 8 * 60
-                and self.no_mods_online + (7 * 60) < time()
-                and self.last_modchat_command + 15 < time()
-            ):
-                self.last_modchat_command = time()
-                await self.send("/modchat +", False)
+        """Sets modchat if there have been no mods online for a while during the night.
+
+        Scheduled when the last mod leaves a room, see MODCHAT_DELAY.
+        """
+        self._modchat_job = None
+        if self.no_mods_online is None:
+            return
+
+        # Check again the next night, since modchat might be disabled in the meantime.
+        self._schedule_modchat(datetime.now(MODCHAT_TZ) + timedelta(days=1))
+
+        # Only set modchat if it's a public room and cerbottana has relevant auth
+        if not self.modchat and self.roombot and not self.is_private:
+            await self.send("/modchat +", False)
 
     async def send(self, message: str, escape: bool = True) -> None:
         """Sends a message to the room.
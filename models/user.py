@@ -28,7 +28,8 @@ class User:
         global_rank (str): PS global rank, defaults to " " if rank is unknown.
         idle (bool): True if user is marked as idle.
         is_administrator (bool): True if user is a bot administrator.
-        rooms (set[Room]): List of rooms the user is in.
+        rooms (set[Room]): Rooms the user is in, see Connection.user_rooms. Don't
+            modify it directly.
     """
 
     def __init__(
@@ -61,7 +62,7 @@ class User:
 
     @property
     def rooms(self) -> set[Room]:
-        return {room for room in self.conn.rooms.values() if self in room}
+        return self.conn.user_rooms.get(self.userid, set())
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, User):
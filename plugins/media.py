@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 import aiohttp
@@ -8,9 +9,60 @@ import utils
 from plugins import command_wrapper
 
 if TYPE_CHECKING:
+    from http_client import HTTPClient
     from models.message import Message
 
 
+# Limits for probing the content type of a url: total time in seconds, and number of
+# bytes requested when the server doesn't support HEAD requests.
+MEDIA_PROBE_TIMEOUT = 5
+MEDIA_PROBE_BYTES = 1024
+
+# Content types of recently probed urls.
+_content_types: utils.LRUCache[str, str] = utils.LRUCache(256)
+
+
+async def get_content_type(http: HTTPClient, url: str) -> str | None:
+    """Retrieves the mime type of a url without downloading its body.
+
+    A HEAD request is sent first, falling back to a GET request for the first
+    MEDIA_PROBE_BYTES bytes. Successful results are cached. Request errors are
+    propagated, and probing is aborted with asyncio.TimeoutError after
+    MEDIA_PROBE_TIMEOUT seconds.
+
+    Args:
+        http (HTTPClient): Used to send the requests, i.e. conn.http.
+        url (str): Url to probe.
+
+    Returns:
+        str | None: Mime type, None if the server responded with an error status.
+    """
+    if url in _content_types:
+        return _content_types[url]
+
+    content_type = await asyncio.wait_for(
+        _probe_content_type(http, url), MEDIA_PROBE_TIMEOUT
+    )
+    if content_type is not None:
+        _content_types[url] = content_type
+    return content_type
+
+
+async def _probe_content_type(http: HTTPClient, url: str) -> str | None:
+    headers = {"Accept": "audio/*; video/*"}
+    async with http.stream("HEAD", url, headers=headers) as response:
+        if response.status < 400 and "Content-Type" in response.headers:
+            return response.content_type
+
+    # Servers that ignore the Range header would send the whole file, but the body is
+    # never read: the connection is closed as soon as the headers are received.
+    headers["Range"] = f"bytes=0-{MEDIA_PROBE_BYTES - 1}"
+    async with http.stream("GET", url, headers=headers) as response:
+        if response.status >= 400:
+            return None
+        return response.content_type
+
+
 @command_wrapper(helpstr="Visualizza/riproduci un file multimediale.")
 async def media(msg: Message) -> None:
     if not msg.arg:
@@ -18,22 +70,24 @@ async def media(msg: Message) -> None:
         return
 
     try:
-        headers = {"Accept": "audio/*; video/*"}
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(msg.arg) as response:
-                macrotype = response.content_type.split("/")[0]
-                if macrotype == "audio":
-                    await msg.reply_htmlbox(f'<audio controls src="{msg.arg}"></audio>')
-                elif macrotype == "video":
-                    # pylint: disable=line-too-long
-                    await msg.reply_htmlbox(
-                        f'<video style="max-width: 100%; max-height: 300px;" controls src="{msg.arg}"></video>'
-                    )
-                elif macrotype == "image" or utils.is_youtube_link(msg.arg):
-                    # This command isn't needed for images and youtube links, force to
-                    # use `!show` if possible.
-                    await msg.reply("Usa ``!show`` per immagini e video YouTube.")
-                else:
-                    await msg.reply("URL non valido")
-    except aiohttp.ClientError:
+        content_type = await get_content_type(msg.conn.http, msg.arg)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        content_type = None
+    if content_type is None:
+        await msg.reply("URL non valido")
+        return
+    macrotype = content_type.split("/")[0]
+
+    if macrotype == "audio":
+        await msg.reply_htmlbox(f'<audio controls src="{msg.arg}"></audio>')
+    elif macrotype == "video":
+        # pylint: disable=line-too-long
+        await msg.reply_htmlbox(
+            f'<video style="max-width: 100%; max-height: 300px;" controls src="{msg.arg}"></video>'
+        )
+    elif macrotype == "image" or utils.is_youtube_link(msg.arg):
+        # This command isn't needed for images and youtube links, force to use `!show`
+        # if possible.
+        await msg.reply("Usa ``!show`` per immagini e video YouTube.")
+    else:
         await msg.reply("URL non valido")
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import math
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
@@ -19,6 +18,7 @@ if TYPE_CHECKING:
     from connection import Connection
     from models.message import Message
     from models.user import User
+    from scheduler import Job
 
 
 # WHITELISTED_CMD: List of commands that are broadcastable in a repeat. We don't have a
@@ -37,7 +37,7 @@ WHITELISTED_CMD = (
 
 class Repeat:
     """Implements an active record pattern to interact with the SQL database;
-    also registers a task to the base asyncio loop of the Connection param.
+    also registers a job to the scheduler of the room connection.
     """
 
     _instances: dict[tuple[str, Room], Repeat] = {}  # Record of active instances
@@ -77,7 +77,7 @@ class Repeat:
             shift = self.delta * math.ceil(offline_period / self.delta)
             self.offset += shift - offline_period
 
-        self.task: asyncio.Task[None] | None = None
+        self.job: Job | None = None
 
         print(self)
 
@@ -105,23 +105,15 @@ class Repeat:
             ]
         )
 
-    async def coro(self) -> None:
-        await asyncio.sleep(self.offset.total_seconds())
-
-        while not self.expired:
-            start = datetime.now()
-            if (
-                # Conditions that cause a repeat to skip a call but not to stop forever
-                not self.room.modchat  # Don't send if modchat is active
-                and self.message not in self.room.buffer  # Throttling
-            ):
-                await self.room.send(self.message, False)
-            else:
-                print(f"Not sending {self.message}")
-            sleep_interval = self.delta - (datetime.now() - start)
-            await asyncio.sleep(sleep_interval.total_seconds())
-
-        self._unlist()
+    async def send(self) -> None:
+        if (
+            # Conditions that cause a repeat to skip a call but not to stop forever
+            not self.room.modchat  # Don't send if modchat is active
+            and self.message not in self.room.buffer  # Throttling
+        ):
+            await self.room.send(self.message, False)
+        else:
+            print(f"Not sending {self.message}")
 
     def start(self) -> bool:
         if self.expired:
@@ -131,13 +123,11 @@ class Repeat:
 
         if self.key in self._instances:  # This instance updates a previous one.
             previous = self._instances[self.key]
-            if previous.task:  # Safety check: should never fail.
-                previous.task.cancel()
+            if previous.job:  # Safety check: should never fail.
+                previous.job.cancel()
                 # No need to previous._unlist(), we'll just update the SQL row.
         self._instances[self.key] = self
 
-        self.task = asyncio.create_task(self.coro())
-
         if self.is_new:
             # If the task has just been created, register it into the SQL db.
             print(f"Registering {self.message} into db.")
@@ -153,11 +143,22 @@ class Repeat:
                     )
                 )
 
+        expire = None
+        if self.expire_dt:
+            expire = (self.expire_dt + timedelta(seconds=1)).timestamp()
+        self.job = self.room.conn.scheduler.every(
+            self.send,
+            self.delta.total_seconds(),
+            delay=self.offset.total_seconds(),
+            expire=expire,
+            on_expire=self._unlist,
+        )
+
         return True
 
     def stop(self) -> None:
-        if self.task:  # Safety check: should never fail.
-            self.task.cancel()
+        if self.job:  # Safety check: should never fail.
+            self.job.cancel()
         self._unlist()
 
     def _unlist(self) -> None:
@@ -80,7 +80,7 @@ async def sprite(msg: Message) -> None:
     url = generate_sprite_url(dex_entry, back=back, shiny=shiny, category=category)
 
     try:
-        html = await image_url_to_html(url)
+        html = await image_url_to_html(url, msg.conn.http.session)
         await msg.reply_htmlbox(html)
     except UnsupportedFormat:
         # Missing sprite. We received a generic Apache error webpage.
@@ -113,7 +113,7 @@ async def randsprite(msg: Message) -> None:
     url = generate_sprite_url(dex_entry, back=back, shiny=shiny)
 
     try:
-        html = await image_url_to_html(url)
+        html = await image_url_to_html(url, msg.conn.http.session)
         await msg.reply_htmlbox(html)
     except UnsupportedFormat:
         # Missing sprite. We received a generic Apache error webpage.
@@ -1,44 +1,219 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import re
 import urllib
 from typing import TYPE_CHECKING
 
 import aiohttp
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import func
 
+import databases.database as d
+import databases.scryfall as s
 import utils
+from database import Database
 from plugins import command_wrapper
+from tasks import init_task_wrapper, recurring_task_wrapper
 from typedefs import JsonDict
 
 if TYPE_CHECKING:
+    from connection import Connection
     from models.message import Message
 
 
-async def query_scryfall(url: str, resp_type: str) -> JsonDict | None:
+SCRYFALL_HOST = "api.scryfall.com"
+
+# Minimum delay between requests, in seconds.
+# https://scryfall.com/docs/api#rate-limits-and-good-citizenship
+SCRYFALL_RATE_LIMIT = 0.1
+
+# Cache lifetime of Scryfall responses in minutes, by endpoint: (valid responses,
+# invalid queries). Random cards are never cached, but invalid random queries are.
+SCRYFALL_CACHE_TTL = {
+    "search": (24 * 60, 60),
+    "random": (0, 60),
+}
+
+
+def normalize_scryfall_url(url: str) -> str:
+    """Normalizes a Scryfall API url, so that equivalent queries share the same cache
+    entry.
+
+    Args:
+        url (str): Scryfall API url.
+
+    Returns:
+        str: Url path and sorted query parameters. The search query is lowercased and
+            its whitespace is collapsed.
+    """
+    parts = urllib.parse.urlsplit(url)
+    params = sorted(
+        (key, " ".join(value.lower().split()) if key == "q" else value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    )
+    return parts.path + "?" + urllib.parse.urlencode(params)
+
+
+async def query_scryfall(conn: Connection, url: str, resp_type: str) -> JsonDict | None:
     """Queries the Scryfall API.
 
+    Responses are cached in the database, see SCRYFALL_CACHE_TTL. Requests are queued
+    to respect the Scryfall rate limit.
+
     Args:
+        conn (Connection): Used to access the shared HTTP client.
         url (str): Query.
         resp_type (str): Expected Scryfall API object type.
 
     Returns:
         JsonDict | None: Valid JSON received from the API, None if data is not valid.
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status != 200:
+    endpoint = urllib.parse.urlsplit(url).path.rsplit("/", 1)[-1]
+    ttl_valid, ttl_invalid = SCRYFALL_CACHE_TTL.get(endpoint, (0, 0))
+    cache_key = normalize_scryfall_url(url)
+
+    db = Database.open()
+    with db.get_session() as session:
+        cached = (
+            session.query(d.ScryfallCache)
+            .filter_by(url=cache_key)
+            .filter(func.julianday(d.ScryfallCache.expiry) - func.julianday() > 0)
+            .first()
+        )
+        if cached:
+            if cached.body is None:
                 return None
-            json_body: JsonDict = await resp.json()
+            cached_body: JsonDict = json.loads(cached.body)
+            return cached_body
+
+    conn.http.set_rate_limit(SCRYFALL_HOST, SCRYFALL_RATE_LIMIT)
+    try:
+        resp = await conn.http.get(url)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Scryfall API error: {e!r}")
+        return None
 
-    # API error handling
-    # Check response type and trust the API that it has the required parameters.
-    if json_body["object"] != resp_type:
-        print(f'Scryfall API error: Response object is "{resp_type}", expected "list"')
+    json_body: JsonDict | None = None
+    if resp.status == 200:
+        json_body = resp.json()
+
+        # API error handling
+        # Check response type and trust the API that it has the required parameters.
+        if json_body["object"] != resp_type:
+            print(
+                f'Scryfall API error: Response object is "{resp_type}", expected "list"'
+            )
+            json_body = None
+    elif resp.status not in (400, 404):
+        # Only cache invalid queries (400) and searches without results (404), other
+        # errors are probably transient.
         return None
 
+    ttl = ttl_valid if json_body is not None else ttl_invalid
+    if ttl:
+        with db.get_session() as session:
+            session.merge(
+                d.ScryfallCache(
+                    url=cache_key,
+                    body=resp.text() if json_body is not None else None,
+                    expiry=func.datetime("now", f"+{ttl} minute"),
+                )
+            )
+
     return json_body
 
 
+def search_local_cards(query: str) -> list[JsonDict] | None:
+    """Searches a card name in the local card index, see scripts/import_scryfall.py.
+
+    Args:
+        query (str): Card name, or the beginning of it. Case insensitive.
+
+    Returns:
+        list[JsonDict] | None: Compact Scryfall Card objects. An exact match discards
+            other results. None if the query should be sent to the API instead: it
+            contains search operators, there are no matches or more than 40 matches,
+            or the index hasn't been imported.
+    """
+    if any(ch in query for ch in ":<>="):  # Scryfall search operators
+        return None
+    card_id = to_card_id(query)
+    if not card_id:
+        return None
+
+    db = Database.open("scryfall")
+    try:
+        with db.get_session() as session:
+            exact = session.query(s.Cards.data).filter_by(card_id=card_id).first()
+            if exact:
+                return [json.loads(exact[0])]
+            rows = (
+                session.query(s.Cards.data)
+                .filter(
+                    s.Cards.card_id >= card_id,
+                    s.Cards.card_id < card_id + "\U0010ffff",
+                )
+                .order_by(s.Cards.card_id)
+                .limit(41)
+                .all()
+            )
+    except OperationalError:
+        return None
+    if not rows or len(rows) > 40:
+        return None
+    return [json.loads(data) for data, in rows]
+
+
+def random_local_card(
+    legal_format: str | None = None,
+    *,
+    include_basic: bool = True,
+    include_extras: bool = False,
+) -> JsonDict | None:
+    """Picks a random card from the local card index, see scripts/import_scryfall.py.
+
+    Args:
+        legal_format (str | None): Only pick cards legal in this format, see
+            databases.scryfall.LEGALITY_FORMATS. Defaults to None.
+        include_basic (bool): Whether to pick basic lands. Defaults to True.
+        include_extras (bool): Whether to pick tokens, planes, ... Defaults to False.
+
+    Returns:
+        JsonDict | None: Compact Scryfall Card object, None if no card matches or the
+            index hasn't been imported.
+    """
+    db = Database.open("scryfall")
+    try:
+        with db.get_session() as session:
+            query = session.query(s.Cards.data)
+            if legal_format is not None:
+                mask = 1 << s.LEGALITY_FORMATS.index(legal_format)
+                query = query.filter(s.Cards.legalities.op("&")(mask) != 0)
+            if not include_basic:
+                query = query.filter_by(is_basic=0)
+            if not include_extras:
+                query = query.filter_by(is_extra=0)
+            row = query.order_by(func.random()).first()
+    except OperationalError:
+        return None
+    if row is None:
+        return None
+    card_json: JsonDict = json.loads(row[0])
+    return card_json
+
+
+@init_task_wrapper(priority=5)
+@recurring_task_wrapper(minute=30)
+async def cleanup_scryfall_cache(conn: Connection) -> None:
+    db = Database.open()
+    with db.get_session() as session:
+        session.query(d.ScryfallCache).filter(
+            func.julianday() - func.julianday(d.ScryfallCache.expiry) > 0
+        ).delete(synchronize_session=False)
+
+
 def to_card_id(card_name: str) -> str:
     """Transform a MtG card name into a string ID.
 
@@ -92,21 +267,26 @@ async def card(msg: Message) -> None:
         await msg.reply("Che carta devo cercare?")
         return
 
-    query = urllib.parse.quote(msg.arg)
-    url = "https://api.scryfall.com/cards/search?include_multilingual=true&q=" + query
-    json_body = await query_scryfall(url, "list")
+    cards = search_local_cards(msg.arg)
+    if cards is None:
+        query = urllib.parse.quote(msg.arg)
+        url = (
+            "https://api.scryfall.com/cards/search?include_multilingual=true&q=" + query
+        )
+        json_body = await query_scryfall(msg.conn, url, "list")
 
-    # If the search didn't match any cards, broaden the scope to include extras (tokens,
-    # planes, ...).
-    if json_body is None:
-        url += "&include_extras=true"
-        json_body = await query_scryfall(url, "list")
+        # If the search didn't match any cards, broaden the scope to include extras
+        # (tokens, planes, ...).
+        if json_body is None:
+            url += "&include_extras=true"
+            json_body = await query_scryfall(msg.conn, url, "list")
 
-    if json_body is None:
-        await msg.reply("Nome non valido")
-        return
+        if json_body is None:
+            await msg.reply("Nome non valido")
+            return
+
+        cards = json_body["data"]  # Scryfall lists are always non-empty.
 
-    cards = json_body["data"]  # Scryfall lists are always non-empty.
     if len(cards) == 1:
         card_ = cards[0]
     else:
@@ -140,7 +320,9 @@ async def guessthecard(msg: Message) -> None:
     query = "+".join([urllib.parse.quote(param) for param in filters])
     url = "https://api.scryfall.com/cards/random?q=" + query
 
-    card_ = await query_scryfall(url, "card")
+    card_ = random_local_card("standard", include_basic=False)
+    if card_ is None:
+        card_ = await query_scryfall(msg.conn, url, "card")
     if card_ is None:  # Safety check. Error is propagated from query_scryfall().
         return
 
@@ -171,7 +353,10 @@ async def randcard(msg: Message) -> None:
         # Users can input an optional query to restrict the cardpool.
         url += "?q=" + urllib.parse.quote(msg.arg)
 
-    card_ = await query_scryfall(url, "card")
+    # Queries are only supported by the API.
+    card_ = None if msg.arg else random_local_card()
+    if card_ is None:
+        card_ = await query_scryfall(msg.conn, url, "card")
     if card_ is None:
         await msg.reply("Ricerca non valida")
         return
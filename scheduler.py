@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import traceback
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from time import time
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    JobFunc = Callable[[], Awaitable[None]]
+    HeapEntry = Tuple[float, int, "Job"]  # timestamp, sequence number, job
+
+
+class Job:
+    """Callback scheduled by a Scheduler. Don't instantiate this class directly, use
+    Scheduler.every or Scheduler.cron instead.
+
+    Attributes:
+        func (JobFunc): Coroutine function called at every run.
+        next_run (float): Timestamp of the next run.
+        interval (float | None): Seconds between two runs, None for cron jobs.
+        expire (float | None): Timestamp after which the job isn't run anymore.
+        iters_left (int | None): Number of remaining runs.
+        minute (int): Minute of cron jobs.
+        hour (int | None): Hour of cron jobs, None to run them every hour.
+        on_expire (Callable[[], None] | None): Called when a job expires, but not when
+            it's cancelled.
+        cancelled (bool): True if the job is no longer scheduled.
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        func: JobFunc,
+        next_run: float,
+        *,
+        interval: float | None = None,
+        expire: float | None = None,
+        max_iters: int | None = None,
+        minute: int = 0,
+        hour: int | None = None,
+        on_expire: Callable[[], None] | None = None,
+    ) -> None:
+        self.scheduler = scheduler
+        self.func = func
+        self.next_run = next_run
+        self.interval = interval
+        self.expire = expire
+        self.iters_left = max_iters
+        self.minute = minute
+        self.hour = hour
+        self.on_expire = on_expire
+        self.cancelled = False
+        self.seq = -1  # Identifies the heap entry of the job, see Scheduler._push
+
+    @property
+    def expired(self) -> bool:
+        if self.iters_left is not None and self.iters_left <= 0:
+            return True
+        return self.expire is not None and self.next_run > self.expire
+
+    def cancel(self) -> None:
+        self.scheduler.cancel(self)
+
+    def reschedule(self, next_run: float) -> None:
+        self.scheduler.reschedule(self, next_run)
+
+    def advance(self) -> None:
+        """Computes the time of the run after next_run."""
+        if self.iters_left is not None:
+            self.iters_left -= 1
+        if self.interval is not None:
+            self.next_run += self.interval
+        else:
+            self.next_run = next_cron_run(self.minute, self.hour, self.next_run)
+
+
+def next_cron_run(minute: int, hour: int | None, after: float) -> float:
+    """Computes the first local time with the given minute (and hour) after a timestamp.
+
+    Args:
+        minute (int): Minute, from 0 to 59.
+        hour (int | None): Hour, from 0 to 23. None matches every hour.
+        after (float): Timestamp.
+
+    Returns:
+        float: Timestamp.
+    """
+    start = datetime.fromtimestamp(after)
+    candidate = start.replace(minute=minute, second=0, microsecond=0)
+    if hour is None:
+        step = timedelta(hours=1)
+    else:
+        candidate = candidate.replace(hour=hour)
+        step = timedelta(days=1)
+    while candidate <= start:
+        candidate += step
+    return candidate.timestamp()
+
+
+class Scheduler:
+    """Runs scheduled jobs from a single task, see Connection.scheduler.
+
+    Jobs are kept in a min-heap ordered by their next run. Entries of cancelled and
+    rescheduled jobs are left in the heap and skipped when popped, until they make up
+    half of it: scheduling, rescheduling and cancelling a job are all O(log n).
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[HeapEntry] = []
+        self._counter = itertools.count()
+        self._stale = 0  # Number of heap entries to skip
+        self._wakeup: asyncio.Event | None = None
+        self._driver: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._stale
+
+    def every(
+        self,
+        func: JobFunc,
+        interval: float,
+        *,
+        delay: float | None = None,
+        expire: float | None = None,
+        max_iters: int | None = None,
+        on_expire: Callable[[], None] | None = None,
+    ) -> Job:
+        """Schedules a job that runs at a fixed interval.
+
+        Args:
+            func (JobFunc): Coroutine function to call.
+            interval (float): Seconds between two runs.
+            delay (float | None): Seconds before the first run. Defaults to None to
+                wait for `interval` seconds.
+            expire (float | None): Timestamp after which the job isn't run anymore.
+                Defaults to None.
+            max_iters (int | None): Maximum number of runs. Defaults to None.
+            on_expire (Callable[[], None] | None): Called when the job expires.
+                Defaults to None.
+
+        Returns:
+            Job: Scheduled job.
+        """
+        next_run = time() + (interval if delay is None else delay)
+        job = Job(
+            self,
+            func,
+            next_run,
+            interval=interval,
+            expire=expire,
+            max_iters=max_iters,
+            on_expire=on_expire,
+        )
+        self._push(job)
+        return job
+
+    def once(self, func: JobFunc, delay: float) -> Job:
+        """Schedules a job that runs only once.
+
+        Args:
+            func (JobFunc): Coroutine function to call.
+            delay (float): Seconds before the run.
+
+        Returns:
+            Job: Scheduled job.
+        """
+        return self.every(func, 0, delay=delay, max_iters=1)
+
+    def cron(self, func: JobFunc, *, minute: int = 0, hour: int | None = None) -> Job:
+        """Schedules a job that runs every hour or every day, at a given local time.
+
+        Args:
+            func (JobFunc): Coroutine function to call.
+            minute (int): Minute of the run. Defaults to 0.
+            hour (int | None): Hour of the run. Defaults to None to run every hour.
+
+        Returns:
+            Job: Scheduled job.
+        """
+        job = Job(
+            self, func, next_cron_run(minute, hour, time()), minute=minute, hour=hour
+        )
+        self._push(job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if job.cancelled:
+            return
+        job.cancelled = True
+        self._discard_entry()
+
+    def reschedule(self, job: Job, next_run: float) -> None:
+        """Moves the next run of a scheduled job.
+
+        Args:
+            job (Job): Scheduled job.
+            next_run (float): Timestamp of the next run.
+        """
+        if job.cancelled:
+            return
+        job.seq = -1  # Invalidate the current heap entry
+        self._discard_entry()
+        job.next_run = next_run
+        self._push(job)
+
+    def _discard_entry(self) -> None:
+        self._stale += 1
+        if self._stale * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not _is_stale(entry)]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def stop(self) -> None:
+        if self._driver is not None:
+            self._driver.cancel()
+            self._driver = None
+
+    def _push(self, job: Job) -> None:
+        if job.expired:
+            job.cancelled = True
+            if job.on_expire is not None:
+                job.on_expire()
+            return
+
+        job.seq = next(self._counter)
+        entry: HeapEntry = (job.next_run, job.seq, job)
+        heapq.heappush(self._heap, entry)
+
+        if self._driver is None or self._driver.done():
+            self._wakeup = asyncio.Event()
+            self._driver = asyncio.create_task(self._drive())
+        elif self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()  # The driver is waiting for a later job.
+
+    def _pop(self) -> Job:
+        entry = heapq.heappop(self._heap)
+        if _is_stale(entry):
+            self._stale -= 1
+        return entry[2]
+
+    async def _drive(self) -> None:
+        assert self._wakeup is not None
+        while self._heap:
+            if _is_stale(self._heap[0]):
+                self._pop()
+                continue
+            next_run, _, job = self._heap[0]
+
+            delay = next_run - time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._pop()
+            asyncio.create_task(self._run(job))
+            job.advance()
+            self._push(job)
+
+    @staticmethod
+    async def _run(job: Job) -> None:
+        try:
+            await job.func()
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+
+
+def _is_stale(entry: HeapEntry) -> bool:
+    return entry[2].cancelled or entry[1] != entry[2].seq
@@ -0,0 +1,159 @@
+"""Imports a Scryfall bulk data file into the local card index, which is used by the
+tcg plugin before falling back to the Scryfall API.
+
+Download a bulk data file (preferably "Oracle Cards") from
+https://scryfall.com/docs/api/bulk-data, then run from the root directory of the
+project:
+    python -m scripts.import_scryfall path/to/oracle-cards.json
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Iterator
+from time import perf_counter
+from typing import Any
+
+import databases.scryfall as s
+from database import Database
+from plugins.tcg import to_card_id
+from typedefs import JsonDict
+
+# Layouts of the cards that Scryfall only shows when searching with include_extras
+EXTRA_LAYOUTS = {
+    "art_series",
+    "double_faced_token",
+    "emblem",
+    "planar",
+    "scheme",
+    "token",
+    "vanguard",
+}
+
+
+def iter_bulk_data(path: str, chunk_size: int = 1 << 20) -> Iterator[JsonDict]:
+    """Lazily parses a bulk data file, a JSON array of Card objects, reading at most
+    `chunk_size` characters at a time.
+
+    Args:
+        path (str): Path of the bulk data file.
+        chunk_size (int): Number of characters read at a time. Defaults to 1 MiB.
+
+    Raises:
+        ValueError: File is truncated or isn't a JSON array of objects.
+
+    Yields:
+        JsonDict: Scryfall Card object.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    with open(path, encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            pos = 0
+            while True:
+                # Skip array delimiters and whitespace between two objects
+                while pos < len(buffer) and buffer[pos] in "[,] \t\r\n":
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                if buffer[pos] != "{":
+                    raise ValueError(f"Unexpected character at {path}: {buffer[pos]}")
+                try:
+                    card, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Partial object, read the next chunk
+                yield card
+            buffer = buffer[pos:]
+
+            if not chunk:
+                if buffer:
+                    raise ValueError(f"{path} is truncated")
+                return
+
+
+def compact_card(card: JsonDict) -> JsonDict:
+    """Keeps only the Card fields used by the tcg plugin.
+
+    Args:
+        card (JsonDict): Scryfall Card object.
+
+    Returns:
+        JsonDict: Subset of `card`.
+    """
+    keys = ("name", "scryfall_uri", "type_line", "mana_cost", "flavor_text")
+    data = {key: card[key] for key in keys if key in card}
+    if "image_uris" in card:
+        data["image_uris"] = {"normal": card["image_uris"]["normal"]}
+    if "card_faces" in card:
+        data["card_faces"] = [
+            {"image_uris": {"normal": face["image_uris"]["normal"]}}
+            if "image_uris" in face
+            else {}
+            for face in card["card_faces"]
+        ]
+    return data
+
+
+def card_row(card: JsonDict) -> dict[str, Any]:  # type: ignore[misc]
+    legalities = card.get("legalities", {})
+    return {
+        "card_id": to_card_id(card["name"]),
+        "name": card["name"],
+        "legalities": sum(
+            1 << i
+            for i, fmt in enumerate(s.LEGALITY_FORMATS)
+            if legalities.get(fmt) == "legal"
+        ),
+        "is_basic": "Basic" in card.get("type_line", "").split("—")[0],
+        "is_extra": card.get("layout") in EXTRA_LAYOUTS
+        or card.get("set_type") in ("token", "memorabilia"),
+        "data": json.dumps(compact_card(card), separators=(",", ":")),
+    }
+
+
+def import_bulk_data(path: str, batch_size: int = 1000) -> int:
+    """Replaces the local card index with the cards of a bulk data file.
+
+    Only the first English printing of every card name is kept.
+
+    Args:
+        path (str): Path of the bulk data file.
+        batch_size (int): Number of rows inserted at a time. Defaults to 1000.
+
+    Returns:
+        int: Number of imported cards.
+    """
+    db = Database.open("scryfall")
+    s.Base.metadata.drop_all(db.engine)
+    s.Base.metadata.create_all(db.engine)
+
+    stmt = s.Cards.__table__.insert().prefix_with("OR IGNORE")
+    batch: list[dict[str, Any]] = []  # type: ignore[misc]
+    with db.engine.begin() as connection:
+        for card in iter_bulk_data(path):
+            if card.get("lang", "en") != "en" or not to_card_id(card["name"]):
+                continue
+            batch.append(card_row(card))
+            if len(batch) >= batch_size:
+                connection.execute(stmt, batch)
+                batch = []
+        if batch:
+            connection.execute(stmt, batch)
+
+    with db.get_session() as session:
+        count: int = session.query(s.Cards).count()
+    return count
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    start = perf_counter()
+    cards_n = import_bulk_data(sys.argv[1])
+    print(f"Imported {cards_n} cards in {perf_counter() - start:.1f} s.")
@@ -0,0 +1,56 @@
+"""Prefills the image dimensions cache with every PS sprite, so that sprite commands
+don't need to probe them at runtime.
+
+Run from the root directory of the project:
+    python -m scripts.prefill_sprites
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+
+import aiohttp
+from imageprobe.errors import ImageprobeError, UnsupportedFormat
+
+import utils
+from http_client import HTTPClient
+from plugins.sprites import SPRITE_CATEGORIES, generate_sprite_url
+
+
+async def prefill(concurrency: int = 8) -> None:
+    urls = {
+        generate_sprite_url(dex_entry, back=back, shiny=shiny, category=category)
+        for dex_entry in utils.POKEDEX.values()
+        for category in set(SPRITE_CATEGORIES.values())
+        for back in (False, True)
+        for shiny in (False, True)
+    }
+    print(f"Probing {len(urls)} sprites...")
+
+    http = HTTPClient(limit_per_host=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Counter[str] = Counter()
+
+    async def prefill_url(url: str) -> None:
+        async with semaphore:
+            try:
+                await utils.get_image_dimensions(url, http.session)
+                results["found"] += 1
+            except UnsupportedFormat:
+                results["missing"] += 1
+            except (ImageprobeError, aiohttp.ClientError) as e:
+                print(f"Error while probing {url}: {e!r}")
+                results["failed"] += 1
+
+    try:
+        await asyncio.gather(*[prefill_url(url) for url in sorted(urls)])
+    finally:
+        await http.close()
+
+    print(", ".join(f"{key}: {value}" for key, value in sorted(results.items())))
+
+
+if __name__ == "__main__":
+
+    asyncio.run(prefill())
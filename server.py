@@ -4,12 +4,11 @@ from typing import TYPE_CHECKING
 
 from flask import Flask, request
 from flask import session as web_session
-from sqlalchemy.sql import func
 from waitress import serve
 
-import databases.database as d
-from database import Database
 from plugins import routes
+from session_store import ServerSessionInterface, session_store
+from token_store import token_store
 
 if TYPE_CHECKING:
     from connection import Connection
@@ -30,25 +29,20 @@ def initialize_server(secret_key: str) -> Server:
     server = Server(__name__)
 
     server.secret_key = secret_key
+    server.session_interface = ServerSessionInterface(session_store)
 
     @server.before_request
     def before() -> None:
         token = request.args.get("token")
 
         if token is not None:
-            db = Database.open()
-            with db.get_session() as session:
-                data = (
-                    session.query(d.Tokens)
-                    .filter_by(token=token)
-                    .filter(func.julianday() - func.julianday(d.Tokens.expiry) < 0)
-                    .all()
-                )
-                for row in data:
-                    if row.room is None:
-                        web_session["_rank"] = row.rank
-                    else:
-                        web_session[row.room] = row.rank
+            ranks = token_store.get(token)
+            if ranks is not None:
+                for room, rank in ranks.items():
+                    key = "_rank" if room is None else room
+                    # Avoid rewriting an unchanged session
+                    if web_session.get(key) != rank:
+                        web_session[key] = rank
 
     for view_func, rule, methods in routes:
         server.add_url_rule(rule, view_func=view_func, methods=methods)
@@ -0,0 +1,179 @@
+# pylint: disable=too-many-ancestors
+
+from __future__ import annotations
+
+import json
+import secrets
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from flask.sessions import SessionInterface, SessionMixin
+from sqlalchemy.sql import func
+from werkzeug.datastructures import CallbackDict
+
+import databases.database as d
+from database import Database
+
+if TYPE_CHECKING:
+    from flask import Flask, Request, Response
+
+# Lifetime of a web session since its last change, in seconds.
+WEB_SESSION_TTL = 24 * 60 * 60
+
+
+class SessionStore:
+    """Server-side storage of web sessions, cached in memory and persisted in the
+    web_sessions table.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # session id, (expiry timestamp, data)
+        self._sessions: dict[str, tuple[float, dict[str, str]]] = {}
+
+    def get(self, session_id: str) -> dict[str, str] | None:
+        """Retrieves the data of a valid session.
+
+        Args:
+            session_id (str): Session id.
+
+        Returns:
+            dict[str, str] | None: Session data, None if the session doesn't exist or
+                is expired.
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._load(session_id)
+        if entry is None:
+            return None
+
+        expiry, data = entry
+        if expiry <= datetime.now(timezone.utc).timestamp():
+            self.delete(session_id)
+            return None
+        return data
+
+    def set(self, session_id: str, data: dict[str, str]) -> None:
+        expiry = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(
+            seconds=WEB_SESSION_TTL
+        )
+        with self._lock:
+            self._sessions[session_id] = (expiry.timestamp(), data)
+
+        db = Database.open()
+        with db.get_session() as session:
+            session.merge(
+                d.WebSessions(
+                    session_id=session_id,
+                    data=json.dumps(data, separators=(",", ":")),
+                    expiry=expiry.strftime("%Y-%m-%d %H:%M:%S"),
+                )
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+        db = Database.open()
+        with db.get_session() as session:
+            session.query(d.WebSessions).filter_by(session_id=session_id).delete()
+
+    def purge(self) -> None:
+        now = datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            self._sessions = {
+                session_id: entry
+                for session_id, entry in self._sessions.items()
+                if entry[0] > now
+            }
+
+        db = Database.open()
+        with db.get_session() as session:
+            session.query(d.WebSessions).filter(
+                func.julianday() - func.julianday(d.WebSessions.expiry) > 0
+            ).delete(synchronize_session=False)
+
+    def _load(self, session_id: str) -> tuple[float, dict[str, str]] | None:
+        db = Database.open()
+        with db.get_session() as session:
+            row = session.query(d.WebSessions).filter_by(session_id=session_id).first()
+            if row is None:
+                return None
+            expiry = (
+                datetime.fromisoformat(row.expiry)
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+            entry = (expiry, json.loads(row.data))
+
+        with self._lock:
+            self._sessions[session_id] = entry
+        return entry
+
+
+class ServerSession(CallbackDict, SessionMixin):  # type: ignore[type-arg]
+    """Flask session whose data is kept in a SessionStore. The cookie only holds its
+    id.
+    """
+
+    def __init__(
+        self,
+        initial: dict[str, str] | None = None,
+        session_id: str = "",
+        new: bool = False,
+    ) -> None:
+        def on_update(self: ServerSession) -> None:
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.session_id = session_id
+        self.new = new
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, store: SessionStore) -> None:
+        self.store = store
+
+    def open_session(  # type: ignore[override]
+        self, app: Flask, request: Request
+    ) -> ServerSession:
+        session_id = request.cookies.get(app.session_cookie_name)
+        if session_id:
+            data = self.store.get(session_id)
+            if data is not None:
+                return ServerSession(data, session_id)
+        return ServerSession(session_id=secrets.token_urlsafe(16), new=True)
+
+    def save_session(
+        self, app: Flask, session: ServerSession, response: Response
+    ) -> None:
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.session_id)
+                response.delete_cookie(
+                    app.session_cookie_name, domain=domain, path=path
+                )
+            return
+
+        if not session.modified:
+            return
+
+        self.store.set(session.session_id, dict(session))
+        response.set_cookie(
+            app.session_cookie_name,
+            session.session_id,
+            domain=domain,
+            path=path,
+            httponly=self.get_cookie_httponly(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+session_store = SessionStore()
@@ -13,6 +13,7 @@ if TYPE_CHECKING:
 
 
 init_tasks: list[tuple[int, InitTaskFunc, bool]] = []
+recurring_tasks: list[tuple[int, int | None, InitTaskFunc]] = []  # minute, hour, func
 
 
 def init_task_wrapper(
@@ -25,6 +26,20 @@ def init_task_wrapper(
     return wrapper
 
 
+def recurring_task_wrapper(
+    *, minute: int = 0, hour: int | None = None
+) -> Callable[[InitTaskFunc], InitTaskFunc]:
+    """Runs a task every hour, or every day if `hour` is specified, at a given local
+    time. See Scheduler.cron.
+    """
+
+    def wrapper(func: InitTaskFunc) -> InitTaskFunc:
+        recurring_tasks.append((minute, hour, func))
+        return func
+
+    return wrapper
+
+
 modules = glob.glob(join(dirname(__file__), "*.py"))
 
 for f in modules:
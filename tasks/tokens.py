@@ -6,16 +6,24 @@ from sqlalchemy.sql import func
 
 import databases.database as d
 from database import Database
-from tasks import init_task_wrapper
+from tasks import init_task_wrapper, recurring_task_wrapper
+from token_store import token_store
 
 if TYPE_CHECKING:
     from connection import Connection
 
 
 @init_task_wrapper(priority=5)
+@recurring_task_wrapper(minute=0)
 async def cleanup_table(conn: Connection) -> None:
     db = Database.open()
     with db.get_session() as session:
         session.query(d.Tokens).filter(
             func.julianday() - func.julianday(d.Tokens.expiry) > 0
         ).delete(synchronize_session=False)
+    token_store.purge()
+
+
+@init_task_wrapper(priority=5)
+async def load_tokens(conn: Connection) -> None:
+    token_store.load()
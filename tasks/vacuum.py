@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from database import Database
+from tasks import recurring_task_wrapper
+
+if TYPE_CHECKING:
+    from connection import Connection
+
+
+@recurring_task_wrapper(minute=30, hour=4)
+async def vacuum(conn: Connection) -> None:
+    """Rebuilds the database file, reclaiming the space freed by the cleanup tasks."""
+    db = Database.open()
+    with db.engine.connect() as connection:
+        connection.execute("VACUUM")
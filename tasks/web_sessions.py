@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from session_store import session_store
+from tasks import init_task_wrapper, recurring_task_wrapper
+
+if TYPE_CHECKING:
+    from connection import Connection
+
+
+@init_task_wrapper(priority=5)
+@recurring_task_wrapper(minute=0)
+async def cleanup_web_sessions(conn: Connection) -> None:
+    session_store.purge()
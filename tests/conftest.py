@@ -16,9 +16,12 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from websockets import ConnectionClosedOK
 
 import databases.database as d
+import databases.scryfall as s
 import utils
 from connection import Connection
 from database import Database
+from models.room import Room
+from models.user import User
 from tasks.veekun import csv_to_sqlite
 
 if TYPE_CHECKING:
@@ -31,6 +34,7 @@ else:
 
 database_metadata: dict[str, Any] = {
     "database": d.db.metadata,
+    "scryfall": s.Base.metadata,
 }
 
 
@@ -288,6 +292,21 @@ def mock_database(mocker) -> None:
     mocker.patch.object(Database, "open", mock_database_open)
 
 
+@pytest.fixture
+def check_user_rooms() -> Callable[[Connection], None]:
+    def check(conn: Connection) -> None:
+        """Checks that conn.user_rooms matches the users of every room."""
+        expected: dict[str, set[Room]] = {}
+        for room in conn.rooms.values():
+            for user in room.users:
+                expected.setdefault(user.userid, set()).add(room)
+        assert conn.user_rooms == expected
+        for userid, rooms in expected.items():
+            assert User.get(conn, userid).rooms == rooms
+
+    return check
+
+
 @pytest.fixture(scope="session")
 def veekun_database() -> None:
     # csv_to_sqlite is an init_task, and as such it expects an instance of Connection as
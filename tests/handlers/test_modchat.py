@@ -1,4 +1,10 @@
-from models.room import Room
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from models.room import MODCHAT_TZ, Room, next_modchat_check
 
 
 def test_modchat(mock_connection) -> None:
@@ -44,6 +50,9 @@ def test_modchat(mock_connection) -> None:
     time = room1.no_mods_online  # type: ignore
     # see https://github.com/python/mypy/issues/9457
 
+    # and modchat is scheduled
+    assert room1._modchat_job is not None  # pylint: disable=protected-access
+
     # another regular user joins then leaves the room, no_mods_online shouldn't change
     recv_queue.add_user_join("room1", "reg2")
     assert room1.no_mods_online == time
@@ -53,6 +62,7 @@ def test_modchat(mock_connection) -> None:
     # a mod comes back then leaves again, no_mods_online should be different
     recv_queue.add_user_join("room1", "mod", "@")
     assert room1.no_mods_online is None
+    assert room1._modchat_job is None  # pylint: disable=protected-access
     recv_queue.add_user_leave("room1", "mod")
     assert room1.no_mods_online is not None
     assert room1.no_mods_online != time
@@ -89,4 +99,69 @@ def test_modchat(mock_connection) -> None:
     recv_queue.add_user_join("room1", "gmod", group="@")
     assert room1.no_mods_online is not None
 
+    # an idle mod doesn't count either
+    recv_queue.add_user_join("room1", "mod@!", "@")
+    assert room1.no_mods_online is not None
+    recv_queue.add_user_namechange("room1", "mod", "mod@!", "@")
+    assert room1.no_mods_online is None
+    recv_queue.add_user_namechange("room1", "mod@!", "mod", "@")
+    assert room1.no_mods_online is not None
+    assert room1._modchat_job is not None  # pylint: disable=protected-access
+
     recv_queue.close()
+
+
+def tz_datetime(year: int, month: int, day: int, hour: int, minute: int) -> datetime:
+    return MODCHAT_TZ.localize(datetime(year, month, day, hour, minute))
+
+
+@pytest.mark.parametrize(
+    "no_mods_online, now, expected",
+    [
+        # During the night: wait for MODCHAT_DELAY
+        (
+            tz_datetime(2021, 3, 1, 2, 0),
+            tz_datetime(2021, 3, 1, 2, 0),
+            tz_datetime(2021, 3, 1, 2, 7),
+        ),
+        (
+            tz_datetime(2021, 3, 1, 2, 0),
+            tz_datetime(2021, 3, 1, 3, 0),
+            tz_datetime(2021, 3, 1, 3, 0),
+        ),
+        # Before the night
+        (
+            tz_datetime(2021, 3, 1, 0, 1),
+            tz_datetime(2021, 3, 1, 0, 1),
+            tz_datetime(2021, 3, 1, 0, 30),
+        ),
+        (
+            tz_datetime(2021, 3, 1, 0, 28),
+            tz_datetime(2021, 3, 1, 0, 28),
+            tz_datetime(2021, 3, 1, 0, 35),
+        ),
+        # After the night
+        (
+            tz_datetime(2021, 3, 1, 7, 58),
+            tz_datetime(2021, 3, 1, 7, 58),
+            tz_datetime(2021, 3, 2, 0, 30),
+        ),
+        (
+            tz_datetime(2021, 3, 1, 18, 0),
+            tz_datetime(2021, 3, 1, 18, 0),
+            tz_datetime(2021, 3, 2, 0, 30),
+        ),
+        # Daylight saving time
+        (
+            tz_datetime(2021, 3, 27, 18, 0),
+            tz_datetime(2021, 3, 27, 18, 0),
+            tz_datetime(2021, 3, 28, 0, 30),
+        ),
+    ],
+)
+def test_next_modchat_check(
+    no_mods_online: datetime, now: datetime, expected: datetime
+) -> None:
+    check = next_modchat_check(no_mods_online.timestamp(), now)
+    assert check == expected
+    assert check.utcoffset() == expected.utcoffset()
@@ -4,7 +4,7 @@ from models.room import Room
 from models.user import User
 
 
-def test_room(mock_connection) -> None:
+def test_room(mock_connection, check_user_rooms) -> None:
     conn, recv_queue, send_queue = mock_connection()
 
     # Join a room with only an user in it
@@ -83,6 +83,7 @@ def test_room(mock_connection) -> None:
     assert User.get(conn, "user4") in room1
     assert User.get(conn, "user5") in room1
     assert User.get(conn, "user6") in room1
+    check_user_rooms(conn)
 
     assert send_queue.get_all() == Counter(
         [
@@ -137,6 +138,8 @@ def test_room(mock_connection) -> None:
     assert User.get(conn, "user4") not in room1
     assert User.get(conn, "user5") not in room1
     assert User.get(conn, "user6") not in room1
+    assert not User.get(conn, "user6").rooms
+    check_user_rooms(conn)
 
     assert send_queue.get_all() == Counter()
 
@@ -146,7 +149,20 @@ def test_room(mock_connection) -> None:
     )
     assert User.get(conn, "cerbottana").global_rank == "+"
     assert User.get(conn, "cerbottana").rank(room1) == "*"
+    assert User.get(conn, "cerbottana").can_pminfobox_to() == room1
 
     assert send_queue.get_all() == Counter()
 
+    # Userdetails add users to every listed room
+    recv_queue.add_user_join("room1", "User 7")
+    recv_queue.add_queryresponse_userdetails(
+        "User 7", rooms={"room1": " ", "room2": "+"}
+    )
+    room2 = Room.get(conn, "room2")
+    assert User.get(conn, "user7").rooms == {room1, room2}
+    assert User.get(conn, "user7").can_pminfobox_to() == room1
+    check_user_rooms(conn)
+
+    send_queue.get_all()
+
     recv_queue.close()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import plugins.media as media
+from http_client import HTTPClient
+
+
+def test_get_content_type() -> None:
+    requests: Counter[tuple[str, str]] = Counter()
+
+    async def audio(request: web.Request) -> web.Response:
+        requests[(request.method, request.path)] += 1
+        return web.Response(body=b"\0" * 4096, content_type="audio/mpeg")
+
+    async def video(request: web.Request) -> web.Response:
+        requests[(request.method, request.path)] += 1
+        assert request.headers["Range"] == f"bytes=0-{media.MEDIA_PROBE_BYTES - 1}"
+        return web.Response(status=206, body=b"\0" * 1024, content_type="video/mp4")
+
+    async def missing(request: web.Request) -> web.Response:
+        requests[(request.method, request.path)] += 1
+        return web.Response(status=404)
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/audio.mp3", audio)
+        app.router.add_get("/video.mp4", video, allow_head=False)
+        app.router.add_get("/missing", missing)
+
+        async with TestServer(app) as server:
+            http = HTTPClient()
+            try:
+                # HEAD requests are enough for most servers
+                url = str(server.make_url("/audio.mp3"))
+                assert await media.get_content_type(http, url) == "audio/mpeg"
+                assert requests == {("HEAD", "/audio.mp3"): 1}
+
+                # Ranged GET requests are the fallback
+                url = str(server.make_url("/video.mp4"))
+                assert await media.get_content_type(http, url) == "video/mp4"
+                assert requests[("GET", "/video.mp4")] == 1
+
+                # Results are cached...
+                assert await media.get_content_type(http, url) == "video/mp4"
+                assert requests[("GET", "/video.mp4")] == 1
+
+                # ...unless the url is invalid
+                url = str(server.make_url("/missing"))
+                assert await media.get_content_type(http, url) is None
+                assert await media.get_content_type(http, url) is None
+                assert requests[("GET", "/missing")] == 2
+            finally:
+                await http.close()
+
+    asyncio.run(run())
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import glob
 import json
+from types import SimpleNamespace
 
 import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
 
 import plugins.tcg as tcg
+import scripts.import_scryfall as import_scryfall
+from http_client import HTTPClient, HTTPResponse
+from typedefs import JsonDict
 
 
 def is_errmsg(html: str) -> bool:
@@ -36,3 +42,119 @@ def test_thumbnail_missing_image_uris() -> None:
         "scryfall_uri": "https://dummy.url/",
     }
     assert is_errmsg(tcg.to_card_thumbnail(card_json))
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "https://api.scryfall.com/cards/search?q=Black%20Lotus",
+            "/cards/search?q=black+lotus",
+        ),
+        (
+            "https://api.scryfall.com/cards/search?q=%20black++LOTUS%20",
+            "/cards/search?q=black+lotus",
+        ),
+        (
+            "https://api.scryfall.com/cards/search?q=lotus&include_extras=true",
+            "/cards/search?include_extras=true&q=lotus",
+        ),
+        (
+            "https://api.scryfall.com/cards/random",
+            "/cards/random?",
+        ),
+    ],
+)
+def test_normalize_scryfall_url(url: str, expected: str) -> None:
+    assert tcg.normalize_scryfall_url(url) == expected
+
+
+def test_query_scryfall_cache(mocker) -> None:
+    responses = {
+        "lotus": (200, {"object": "list", "data": [{"name": "Black Lotus"}]}),
+        "invalid": (404, {"object": "error"}),
+        "down": (503, {"object": "error"}),
+    }
+    requested_urls: list[str] = []
+
+    async def mock_get(url: str) -> HTTPResponse:
+        requested_urls.append(url)
+        status, body = responses[url.split("q=")[-1].lower()]
+        headers: CIMultiDictProxy[str] = CIMultiDictProxy(
+            CIMultiDict({"Content-Type": "application/json"})
+        )
+        return HTTPResponse(url, status, headers, json.dumps(body).encode())
+
+    http = HTTPClient()
+    mocker.patch.object(http, "get", mock_get)
+    conn = SimpleNamespace(http=http)
+
+    def query(endpoint: str, q: str) -> JsonDict | None:
+        url = f"https://api.scryfall.com/cards/{endpoint}?q={q}"
+        resp_type = "list" if endpoint == "search" else "card"
+        return asyncio.run(tcg.query_scryfall(conn, url, resp_type))  # type: ignore
+
+    # Valid searches are cached
+    assert query("search", "lotus") == responses["lotus"][1]
+    assert query("search", "LOTUS") == responses["lotus"][1]
+    assert len(requested_urls) == 1
+
+    # Invalid queries are cached too, for both endpoints
+    assert query("search", "invalid") is None
+    assert query("search", "invalid") is None
+    assert query("random", "invalid") is None
+    assert query("random", "invalid") is None
+    assert len(requested_urls) == 3
+
+    # Transient errors aren't cached
+    assert query("search", "down") is None
+    assert query("search", "down") is None
+    assert len(requested_urls) == 5
+
+    assert http.rate_limits == {tcg.SCRYFALL_HOST: tcg.SCRYFALL_RATE_LIMIT}
+
+
+def test_local_card_index(tmp_path) -> None:
+    cards = []
+    for layout in sorted(glob.glob("tests/fixtures/scryfall/layouts/*.json")):
+        with open(layout) as testdata:
+            cards.append(json.load(testdata))
+    bulk_data = tmp_path / "bulk.json"
+    bulk_data.write_text(json.dumps(cards, indent=2))
+
+    # Objects can span several chunks
+    for chunk_size in (1, 7, 4096):
+        parsed = list(import_scryfall.iter_bulk_data(str(bulk_data), chunk_size))
+        assert parsed == cards
+
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text(json.dumps(cards)[:-20])
+    with pytest.raises(ValueError):
+        list(import_scryfall.iter_bulk_data(str(truncated), 100))
+
+    # Duplicate printings are discarded
+    bulk_data.write_text(json.dumps(cards + cards[:1]))
+    assert import_scryfall.import_bulk_data(str(bulk_data), batch_size=2) == len(cards)
+
+    for card_json in cards:
+        matches = tcg.search_local_cards(card_json["name"].upper())
+        assert matches is not None and len(matches) == 1
+        assert matches[0]["name"] == card_json["name"]
+        assert not is_errmsg(tcg.to_card_thumbnail(matches[0]))
+
+    matches = tcg.search_local_cards("search for")
+    assert matches is not None
+    assert [c["name"] for c in matches] == [
+        "Search for Azcanta // Azcanta, the Sunken Ruin"
+    ]
+
+    # Misses and search queries fall back to the API
+    assert tcg.search_local_cards("black lotus") is None
+    assert tcg.search_local_cards("t:creature") is None
+
+    tokens = [c["name"] for c in cards if c["layout"] == "double_faced_token"]
+    for _ in range(20):
+        card_json = tcg.random_local_card()
+        assert card_json is not None
+        assert card_json["name"] not in tokens
+    assert tcg.random_local_card("oldschool") is None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from time import monotonic
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from http_client import HTTPClient
+
+
+def test_http_client() -> None:
+    requests: Counter[str] = Counter()
+
+    async def slow(request: web.Request) -> web.Response:
+        requests["slow"] += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({"ok": True})
+
+    async def flaky(request: web.Request) -> web.Response:
+        requests["flaky"] += 1
+        if requests["flaky"] < 3:
+            return web.Response(status=503)
+        return web.Response(text="ok")
+
+    async def form(request: web.Request) -> web.Response:
+        requests["form"] += 1
+        data = await request.post()
+        return web.Response(status=503, text=str(data["name"]))
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/slow", slow)
+        app.router.add_get("/flaky", flaky)
+        app.router.add_post("/form", form)
+
+        async with TestServer(app) as server:
+            http = HTTPClient(backoff=0)
+            try:
+                # Identical GET requests are coalesced
+                responses = await asyncio.gather(
+                    *[http.get(str(server.make_url("/slow"))) for _ in range(5)]
+                )
+                assert requests["slow"] == 1
+                assert all(resp.json() == {"ok": True} for resp in responses)
+                assert responses[0].content_type == "application/json"
+
+                # ...but only while they're in flight
+                await http.get(str(server.make_url("/slow")))
+                assert requests["slow"] == 2
+
+                # Transient errors are retried
+                resp = await http.get(str(server.make_url("/flaky")))
+                assert resp.status == 200
+                assert resp.text() == "ok"
+                assert requests["flaky"] == 3
+
+                # POST requests are never retried
+                resp = await http.post(
+                    str(server.make_url("/form")), data={"name": "cerbottana"}
+                )
+                assert resp.status == 503
+                assert resp.text() == "cerbottana"
+                assert requests["form"] == 1
+
+                # Rate limited requests are spaced out
+                http.set_rate_limit(server.host, 0.05)
+                start = monotonic()
+                await asyncio.gather(
+                    *[http.get(str(server.make_url(f"/flaky?{i}"))) for i in range(3)]
+                )
+                assert monotonic() - start >= 0.1
+                assert requests["flaky"] == 6
+
+                stats = http.stats[server.host]
+                assert stats.requests == 9
+                assert stats.errors == 0
+                assert 0 < stats.mean_time <= stats.max_time
+            finally:
+                await http.close()
+
+    asyncio.run(run())
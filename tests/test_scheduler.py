@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from functools import partial
+from time import time
+
+import pytest
+
+from scheduler import Scheduler, next_cron_run
+
+
+def test_scheduler() -> None:
+    runs: Counter[str] = Counter()
+    expired: list[str] = []
+
+    async def record(name: str) -> None:
+        runs[name] += 1
+
+    async def run() -> None:
+        scheduler = Scheduler()
+
+        scheduler.every(partial(record, "max_iters"), 0.01, delay=0, max_iters=3)
+        scheduler.every(
+            partial(record, "expire"),
+            0.01,
+            expire=time() + 0.045,
+            on_expire=lambda: expired.append("expire"),
+        )
+        cancelled = scheduler.every(partial(record, "cancelled"), 0.01)
+        rescheduled = scheduler.every(partial(record, "rescheduled"), 10)
+        forever = scheduler.every(partial(record, "forever"), 0.01)
+
+        # Already expired jobs are never run
+        scheduler.every(
+            partial(record, "expired"),
+            0.01,
+            expire=time() - 1,
+            on_expire=lambda: expired.append("expired"),
+        )
+        assert expired == ["expired"]
+
+        await asyncio.sleep(0.005)
+        cancelled.cancel()
+        rescheduled.reschedule(time() + 0.02)
+        assert len(scheduler) == 4
+
+        await asyncio.sleep(0.1)
+        assert runs["max_iters"] == 3
+        assert runs["expire"] == 4
+        assert expired == ["expired", "expire"]
+        assert runs["cancelled"] == 0
+        assert runs["rescheduled"] == 1
+        assert runs["forever"] >= 5
+        assert len(scheduler) == 2  # forever, rescheduled
+
+        forever.cancel()
+        rescheduled.cancel()
+        assert len(scheduler) == 0
+        scheduler.stop()
+
+    asyncio.run(run())
+
+
+def test_scheduler_many_jobs() -> None:
+    async def noop() -> None:
+        pass
+
+    async def run() -> None:
+        scheduler = Scheduler()
+        jobs = [scheduler.every(noop, 60 + i) for i in range(100)]
+        for job in jobs[::2]:
+            job.reschedule(job.next_run + 60)
+        for job in jobs[:80]:
+            job.cancel()
+        assert len(scheduler) == 20
+        # Stale heap entries are eventually discarded
+        assert len(scheduler._heap) < 100  # pylint: disable=protected-access
+        scheduler.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "minute, hour, now, expected",
+    [
+        (0, None, datetime(2021, 3, 1, 10, 30), datetime(2021, 3, 1, 11, 0)),
+        (30, None, datetime(2021, 3, 1, 10, 15), datetime(2021, 3, 1, 10, 30)),
+        (30, None, datetime(2021, 3, 1, 10, 30), datetime(2021, 3, 1, 11, 30)),
+        (30, 4, datetime(2021, 3, 1, 3, 0), datetime(2021, 3, 1, 4, 30)),
+        (30, 4, datetime(2021, 3, 1, 10, 0), datetime(2021, 3, 2, 4, 30)),
+        (0, 0, datetime(2021, 12, 31, 23, 59), datetime(2022, 1, 1, 0, 0)),
+    ],
+)
+def test_next_cron_run(
+    minute: int, hour: int | None, now: datetime, expected: datetime
+) -> None:
+    assert next_cron_run(minute, hour, now.timestamp()) == expected.timestamp()
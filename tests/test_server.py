@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import utils
+from plugins import route_check_permission
+from server import initialize_server
+from session_store import SessionStore, session_store
+
+
+def test_server_sessions(mocker) -> None:
+    server = initialize_server("secret")
+
+    def view(**kwargs: str) -> str:
+        return "ok"
+
+    server.add_url_rule("/global", view_func=route_check_permission(view, "driver"))
+    server.add_url_rule(
+        "/room/<room>", "room", view_func=route_check_permission(view, "driver")
+    )
+    client = server.test_client()
+
+    assert client.get("/global").status_code == 401
+
+    token_id = utils.create_token({"room1": "%", "room2": "+"}, 30, "@")
+    resp = client.get(f"/global?token={token_id}")
+    assert resp.status_code == 200
+
+    # The cookie only holds the session id
+    cookie = resp.headers["Set-Cookie"].split(";")[0]
+    session_id = cookie.split("=", 1)[1]
+    assert len(cookie) < 64
+
+    assert client.get("/room/room1").status_code == 200
+    assert client.get("/room/room2").status_code == 401
+    assert client.get("/room/room3").status_code == 401
+
+    # Unchanged sessions don't set the cookie again
+    assert "Set-Cookie" not in client.get(f"/global?token={token_id}").headers
+
+    # Sessions are persisted
+    store = SessionStore()
+    assert store.get(session_id) == {"_rank": "@", "room1": "%", "room2": "+"}
+    assert store.get("invalid") is None
+
+    # Expired sessions are discarded
+    mocker.patch("session_store.WEB_SESSION_TTL", -1)
+    session_store.set(session_id, {"_rank": "@"})
+    assert client.get("/global").status_code == 401
+    assert SessionStore().get(session_id) is None
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from time import time
+
+from sqlalchemy.sql import func
+
+import databases.database as d
+from database import Database
+from token_store import TokenStore
+
+
+def test_token_store() -> None:
+    store = TokenStore()
+    store.add("valid", {None: "&", "room1": "+"}, time() + 60)
+    store.add("expired", {"room1": "+"}, time() - 1)
+    store.add("expired2", {"room1": "+"}, time() - 1)
+
+    assert store.get("valid") == {None: "&", "room1": "+"}
+    assert store.get("invalid") is None
+
+    # Expired tokens are discarded lazily...
+    assert len(store) == 3
+    assert store.get("expired") is None
+    assert len(store) == 2
+
+    # ...or by purge()
+    store.purge()
+    assert len(store) == 1
+
+
+def test_token_store_load() -> None:
+    db = Database.open()
+    with db.get_session() as session:
+        session.add_all(
+            [
+                d.Tokens(
+                    token="valid",
+                    room=None,
+                    rank="&",
+                    expiry=func.datetime("now", "+10 minute"),
+                ),
+                d.Tokens(
+                    token="valid",
+                    room="room1",
+                    rank="+",
+                    expiry=func.datetime("now", "+10 minute"),
+                ),
+                d.Tokens(
+                    token="expired",
+                    room="room1",
+                    rank="+",
+                    expiry=func.datetime("now", "-10 minute"),
+                ),
+            ]
+        )
+
+    store = TokenStore()
+    store.load()
+    assert len(store) == 1
+    assert store.get("valid") == {None: "&", "room1": "+"}
+    assert store.get("expired") is None
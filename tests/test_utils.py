@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 
 import pytest
+from imageprobe.errors import UnsupportedFormat
+from imageprobe.types import ImageData
 
 import databases.database as d
 import utils
 from database import Database
+from token_store import token_store
 from typedefs import Role
 
 
@@ -38,6 +42,11 @@ def test_create_token(
             # 5 seconds should be more than enough
             assert abs(delta.total_seconds()) - expire_minutes * 60 < 5
 
+    ranks = token_store.get(token_id)
+    assert ranks is not None
+    assert {room: rank for room, rank in ranks.items() if room is not None} == rooms
+    assert ranks.get(None) == admin
+
 
 @pytest.mark.parametrize(
     "role, userrank, expected",
@@ -110,3 +119,64 @@ def test_has_role(role: Role, userrank: str, expected: bool) -> None:
 )
 def test_linkify(uri: str, expected_html: str) -> None:
     assert utils.linkify(uri) == expected_html
+
+
+def test_get_image_dimensions(mocker) -> None:
+    probed_urls: list[str] = []
+
+    async def mock_probe(url: str, http_session: None) -> ImageData:
+        probed_urls.append(url)
+        await asyncio.sleep(0)
+        if url.endswith("missing.png"):
+            raise UnsupportedFormat
+        return ImageData(40, 30, "png", "image/png")
+
+    mocker.patch("utils.probe", mock_probe)
+
+    async def get_dimensions(*urls: str) -> list[tuple[int, int] | None]:
+        results = await asyncio.gather(
+            *[utils.get_image_dimensions(url) for url in urls], return_exceptions=True
+        )
+        return [None if isinstance(i, UnsupportedFormat) else i for i in results]
+
+    # Concurrent requests for the same url are coalesced
+    assert asyncio.run(get_dimensions("a.png", "a.png", "missing.png")) == [
+        (40, 30),
+        (40, 30),
+        None,
+    ]
+    assert probed_urls == ["a.png", "missing.png"]
+
+    # Both valid and missing images are cached
+    assert asyncio.run(get_dimensions("a.png", "missing.png")) == [(40, 30), None]
+    assert probed_urls == ["a.png", "missing.png"]
+
+    # Missing images are probed again once the negative cache expires
+    db = Database.open()
+    with db.get_session() as session:
+        session.query(d.ImageDimensions).filter_by(url="missing.png").update(
+            {"date": "2000-01-01 00:00:00"}
+        )
+    assert asyncio.run(get_dimensions("missing.png")) == [None]
+    assert probed_urls == ["a.png", "missing.png", "missing.png"]
+
+
+def test_lru_cache() -> None:
+    cache: utils.LRUCache[str, int] = utils.LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # "b" is now the least recently used item
+    cache["c"] = 3
+    assert "b" not in cache
+    assert len(cache) == 2
+
+    assert cache.get("a") == 1
+    cache["d"] = 4
+    assert "c" not in cache
+    assert cache.get("c") is None
+    assert cache.get("c", 0) == 0
+
+    del cache["a"]
+    assert "a" not in cache
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+from time import time
+
+from sqlalchemy.sql import func
+
+import databases.database as d
+from database import Database
+
+
+class TokenStore:
+    """In-memory copy of the tokens table, shared between the bot and the web server.
+
+    Tokens are validated without querying the database. Expired tokens are discarded
+    lazily when they're looked up, and periodically by purge().
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # token, (expiry timestamp, {room or None for global ranks: rank})
+        self._tokens: dict[str, tuple[float, dict[str | None, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, token: str, ranks: dict[str | None, str], expiry: float) -> None:
+        with self._lock:
+            self._tokens[token] = (expiry, ranks)
+
+    def get(self, token: str) -> dict[str | None, str] | None:
+        """Validates a token.
+
+        Args:
+            token (str): Token id.
+
+        Returns:
+            dict[str | None, str] | None: Ranks granted by the token, keyed by roomid
+                (None for the global rank). None if the token is invalid or expired.
+        """
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            expiry, ranks = entry
+            if expiry <= time():
+                del self._tokens[token]
+                return None
+            return ranks
+
+    def purge(self) -> None:
+        now = time()
+        with self._lock:
+            self._tokens = {
+                token: entry for token, entry in self._tokens.items() if entry[0] > now
+            }
+
+    def load(self) -> None:
+        """Replaces the stored tokens with the valid ones in the database."""
+        tokens: dict[str, tuple[float, dict[str | None, str]]] = {}
+        db = Database.open()
+        with db.get_session() as session:
+            rows = (
+                session.query(d.Tokens)
+                .filter(func.julianday(d.Tokens.expiry) - func.julianday() > 0)
+                .all()
+            )
+            for row in rows:
+                expiry = (
+                    datetime.fromisoformat(row.expiry)
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
+                )
+                tokens.setdefault(row.token, (expiry, {}))[1][row.room] = row.rank
+        with self._lock:
+            self._tokens = tokens
+
+
+token_store = TokenStore()
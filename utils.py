@@ -1,53 +1,104 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import random
 import re
 import string
 import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from html import escape
-from typing import Any
+from typing import Any, Generic, TypeVar
 
+import aiohttp
 import htmlmin  # type: ignore
 from imageprobe import probe
+from imageprobe.errors import UnsupportedFormat
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import or_
 from sqlalchemy.sql import func
 
 import databases.database as d
 from database import Database
+from token_store import token_store
 from typedefs import JsonDict, Role, RoomId, UserId
 
+KT = TypeVar("KT")
+VT = TypeVar("VT")
+
+
+class LRUCache(Generic[KT, VT]):
+    """Mapping that holds at most `maxsize` items, discarding the least recently used
+    ones first. Membership tests with `in` don't count as uses.
+
+    Attributes:
+        maxsize (int): Maximum number of items.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[KT, VT] = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: KT) -> VT:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: KT) -> None:
+        del self._data[key]
+
+    def get(self, key: KT, default: VT | None = None) -> VT | None:
+        if key not in self._data:
+            return default
+        return self[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
 
 def create_token(
     rooms: dict[str, str], expire_minutes: int = 30, admin: str | None = None
 ) -> str:
     token_id = os.urandom(16).hex()
-    expiry = f"+{expire_minutes} minute"
+    expiry = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(
+        minutes=expire_minutes
+    )
 
-    values = []
+    ranks: dict[str | None, str] = {room: rank for room, rank in rooms.items()}
     if admin is not None:
-        values.append(
-            d.Tokens(
-                token=token_id,
-                room=None,
-                rank=admin,
-                expiry=func.datetime("now", expiry),
-            )
-        )
-    for room in rooms:
-        values.append(
-            d.Tokens(
-                token=token_id,
-                room=room,
-                rank=rooms[room],
-                expiry=func.datetime("now", expiry),
-            )
-        )
+        ranks[None] = admin
 
     db = Database.open()
     with db.get_session() as session:
-        session.add_all(values)
+        session.bulk_insert_mappings(
+            d.Tokens,
+            [
+                {
+                    "token": token_id,
+                    "room": room,
+                    "rank": rank,
+                    # Same format as SQLite datetime()
+                    "expiry": expiry.strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                for room, rank in ranks.items()
+            ],
+        )
+
+    token_store.add(token_id, ranks, expiry.timestamp())
 
     return token_id
 
@@ -116,10 +167,93 @@ def html_escape(text: str | None) -> str:
     return escape(text).replace("\n", "<br>")
 
 
-async def image_url_to_html(url: str) -> str:
+async def image_url_to_html(
+    url: str, http_session: aiohttp.ClientSession | None = None
+) -> str:
     """Generates an <img> tag from an image url."""
-    image = await probe(url)
-    return f'<img src="{url}" width="{image.width}" height="{image.height}">'
+    width, height = await get_image_dimensions(url, http_session)
+    return f'<img src="{url}" width="{width}" height="{height}">'
+
+
+# Images that couldn't be probed are cached too, but only for this many days: missing
+# sprites are eventually added to PS.
+IMAGE_DIMENSIONS_NEGATIVE_TTL = 1
+
+_pending_probes: dict[str, asyncio.Task[tuple[int, int] | None]] = {}
+
+
+async def get_image_dimensions(
+    url: str, http_session: aiohttp.ClientSession | None = None
+) -> tuple[int, int]:
+    """Retrieves the dimensions of an image, probing it only if they aren't cached.
+
+    Concurrent requests for the same url share a single probe.
+
+    Args:
+        url (str): Image url.
+        http_session (aiohttp.ClientSession | None): Session used to probe the image,
+            i.e. conn.http.session. Defaults to None to use a temporary one.
+
+    Raises:
+        UnsupportedFormat: url doesn't point to a valid image.
+
+    Returns:
+        tuple[int, int]: Width and height of the image.
+    """
+    dimensions: tuple[int, int] | None = None
+
+    db = Database.open()
+    with db.get_session() as session:
+        row = (
+            session.query(d.ImageDimensions)
+            .filter_by(url=url)
+            .filter(
+                or_(
+                    d.ImageDimensions.width.isnot(None),  # type: ignore  # sqlalchemy
+                    func.julianday() - func.julianday(d.ImageDimensions.date)
+                    < IMAGE_DIMENSIONS_NEGATIVE_TTL,
+                )
+            )
+            .first()
+        )
+        if row and row.width is not None and row.height is not None:
+            dimensions = (row.width, row.height)
+
+    if row is None:
+        if url not in _pending_probes:
+            task = asyncio.create_task(_probe_image_dimensions(url, http_session))
+            task.add_done_callback(lambda _: _pending_probes.pop(url, None))
+            _pending_probes[url] = task
+        # Shield the probe: it's shared with other callers that might still need it.
+        dimensions = await asyncio.shield(_pending_probes[url])
+
+    if dimensions is None:
+        raise UnsupportedFormat
+    return dimensions
+
+
+async def _probe_image_dimensions(
+    url: str, http_session: aiohttp.ClientSession | None
+) -> tuple[int, int] | None:
+    try:
+        image = await probe(url, http_session)
+        dimensions: tuple[int, int] | None = (image.width, image.height)
+    except UnsupportedFormat:
+        # Not an image, i.e. a missing sprite returns a generic Apache error webpage.
+        dimensions = None
+
+    db = Database.open()
+    with db.get_session() as session:
+        session.merge(
+            d.ImageDimensions(
+                url=url,
+                width=dimensions[0] if dimensions else None,
+                height=dimensions[1] if dimensions else None,
+                date=func.datetime(),
+            )
+        )
+
+    return dimensions
 
 
 def is_youtube_link(url: str) -> bool: